@@ -8,6 +8,12 @@ from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
 from typing import List, Dict, Any
 import re
 
+from memory import MemoryWatchdog, MemoryLimitExceeded
+from locations import DEFAULT_REGIONS, filter_regions, normalize_location
+
+# How many times a page is re-queued after the browser blows its memory limit
+MAX_REQUEUES = 2
+
 class BaseScraper:
     """Base class for all ATLAS scrapers."""
 
@@ -20,23 +26,94 @@ class BaseScraper:
             wait_until="networkidle",
             delay_before_return_html=2.0,
         )
+        self.watchdog = MemoryWatchdog()
+        self.regions = DEFAULT_REGIONS
+        self._crawler = None
+        self._recycle_pending = False
+
+    async def __aenter__(self):
+        """Keep one browser open across pages until the block exits."""
+        await self.start_browser()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close_browser()
+
+    async def start_browser(self):
+        """Launch the shared browser if it isn't running."""
+        if self._crawler is None:
+            crawler = AsyncWebCrawler(config=self.browser_config)
+            await crawler.start()
+            self._crawler = crawler
+
+    async def close_browser(self):
+        """Shut down the shared browser if it is running."""
+        crawler, self._crawler = self._crawler, None
+        if crawler is not None:
+            await crawler.close()
+
+    async def recycle_browser(self):
+        """Restart the shared browser to release leaked memory."""
+        await self.close_browser()
+        await self.start_browser()
+        self._recycle_pending = False
+        self.watchdog.recycled()
+
+    async def _fetch(self, url: str) -> str:
+        """
+        Load one page in the shared browser under the memory watchdog.
+
+        A recycle requested by the previous page happens here, so no
+        browser is launched after the last page.
+
+        Raises:
+            MemoryLimitExceeded: If the browser crossed the hard limit mid-page
+        """
+        if self._recycle_pending:
+            await self.recycle_browser()
+
+        try:
+            result = await self.watchdog.guard(
+                self._crawler.arun(url=url, config=self.run_config)
+            )
+        except MemoryLimitExceeded:
+            self._recycle_pending = True
+            raise
+
+        if self.watchdog.after_page(url):
+            sample = self.watchdog.samples[-1]
+            print(f"   ♻️  Recycling browser before next page (python {sample.python_mb:.0f} MB, "
+                  f"browser {sample.browser_mb:.0f} MB)")
+            self._recycle_pending = True
+
+        if result.success:
+            return result.markdown
+        raise Exception(f"Failed to scrape {url}: {result.error_message}")
 
     async def scrape(self, url: str) -> str:
         """
         Scrape a URL and return clean markdown content.
 
+        Uses the shared browser inside `async with scraper:`, otherwise
+        launches a browser just for this page.
+
         Args:
             url: The URL to scrape
 
         Returns:
             Clean markdown content of the page
         """
-        async with AsyncWebCrawler(config=self.browser_config) as crawler:
-            result = await crawler.arun(url=url, config=self.run_config)
-            if result.success:
-                return result.markdown
-            else:
-                raise Exception(f"Failed to scrape {url}: {result.error_message}")
+        if self._crawler is None:
+            async with self:
+                return await self.scrape(url)
+
+        for _ in range(MAX_REQUEUES + 1):
+            try:
+                return await self._fetch(url)
+            except MemoryLimitExceeded as e:
+                print(f"   ♻️  {e}, re-queuing {url} in a fresh browser")
+
+        raise Exception(f"Failed to scrape {url}: browser kept exceeding its memory limit")
 
     def parse_jobs(self, markdown: str) -> List[Dict[str, Any]]:
         """
@@ -51,31 +128,30 @@ class BaseScraper:
         """
         raise NotImplementedError("Subclasses must implement parse_jobs()")
 
-    def filter_california(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def filter_regions(self, jobs: List[Dict[str, Any]], regions=None) -> List[Dict[str, Any]]:
         """
-        Filter jobs to only include California locations.
+        Filter jobs to the target regions (see locations.py).
 
         Args:
             jobs: List of job dictionaries
+            regions: Region codes like {"US-CA", "REMOTE"} (default: self.regions)
 
         Returns:
-            Filtered list of California jobs
+            Filtered list of jobs
         """
-        ca_keywords = [
-            'california', 'ca', 'san francisco', 'sf', 'los angeles', 'la',
-            'san jose', 'san diego', 'palo alto', 'mountain view', 'sunnyvale',
-            'santa clara', 'cupertino', 'menlo park', 'redwood city', 'oakland',
-            'berkeley', 'irvine', 'santa monica', 'pasadena', 'sacramento',
-            'remote', 'hybrid'
-        ]
+        return filter_regions(jobs, regions or self.regions)
+
+    def filter_california(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Filter jobs to only include California, remote and hybrid locations.
 
-        filtered = []
-        for job in jobs:
-            location = job.get('location', '').lower()
-            if any(keyword in location for keyword in ca_keywords):
-                filtered.append(job)
+        Args:
+            jobs: List of job dictionaries
 
-        return filtered
+        Returns:
+            Filtered list of California jobs
+        """
+        return self.filter_regions(jobs, {"US-CA", "REMOTE", "HYBRID"})
 
     def to_atlas_format(self, job: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -98,7 +174,7 @@ class BaseScraper:
             "description": job.get("description", ""),
             "tags": job.get("tags", []),
             "requirements": job.get("requirements", []),
-            "is_remote": any(word in location.lower() for word in ["remote", "hybrid"]),
+            "is_remote": normalize_location(location).is_remote,
             "posted_date": job.get("posted_date"),
             "deadline": job.get("deadline"),
             "salary_min": job.get("salary_min"),
@@ -0,0 +1,270 @@
+"""
+Location Normalization for ATLAS
+================================
+Parses raw location strings like "San Francisco, CA / Remote (US)" into
+structured places and filters jobs against any set of target regions.
+
+Regions use ISO 3166 style codes plus two keywords:
+    "US"        Anywhere in a country
+    "US-CA"     A state or province
+    "REMOTE"    Remote jobs
+    "HYBRID"    Hybrid jobs
+
+Place names come from an offline gazetteer (gazetteer.tsv) loaded once
+into a lookup table. Location strings repeat heavily across listings, so
+parsed results are cached.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Any, Optional, Tuple
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.tsv")
+
+# Longest place name, in words, tried when scanning a location string
+MAX_PHRASE_WORDS = 4
+
+# Where a location string may list another place. "or"/"and" only count
+# between words, so the state code in "Portland, OR / Remote" survives
+_SEPARATORS = re.compile(
+    r"[,;|/•·()\[\]\n]|(?<=\w)\s+(?:or|and|&)\s+(?=\w)|\s+-\s+", re.IGNORECASE
+)
+_WORD = re.compile(r"[A-Za-zÀ-ÿ][A-Za-zÀ-ÿ.']*")
+_REMOTE = re.compile(r"\b(?:remote|anywhere|work from home|wfh)\b", re.IGNORECASE)
+_HYBRID = re.compile(r"\bhybrid\b", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Place:
+    """One resolved place. Any field may be None if it wasn't given."""
+    city: Optional[str]
+    state: Optional[str]
+    country: Optional[str]
+
+
+@dataclass(frozen=True)
+class NormalizedLocation:
+    """Structured form of a raw location string."""
+    places: Tuple[Place, ...]
+    remote: bool
+    hybrid: bool
+    regions: FrozenSet[str]
+
+    @property
+    def is_remote(self) -> bool:
+        """Remote or hybrid, matching the `is_remote` database column."""
+        return self.remote or self.hybrid
+
+    @property
+    def city(self) -> Optional[str]:
+        return self.places[0].city if self.places else None
+
+    @property
+    def state(self) -> Optional[str]:
+        return self.places[0].state if self.places else None
+
+    @property
+    def country(self) -> Optional[str]:
+        return self.places[0].country if self.places else None
+
+    def matches(self, regions: FrozenSet[str]) -> bool:
+        """Whether any of this location's regions is in the target set."""
+        return not self.regions.isdisjoint(regions)
+
+
+def parse_regions(text: str) -> FrozenSet[str]:
+    """
+    Parse a comma separated region list like "US-CA, US-NY, remote".
+
+    Returns:
+        Set of uppercase region codes
+    """
+    return frozenset(r.strip().upper() for r in text.split(",") if r.strip())
+
+
+# Regions scrapers filter to unless told otherwise
+DEFAULT_REGIONS = parse_regions(os.getenv("ATLAS_REGIONS", "US-CA,REMOTE,HYBRID"))
+
+
+# =============================================================================
+# Gazetteer
+# =============================================================================
+
+def _key(text: str) -> str:
+    return text.lower().replace(".", "").strip()
+
+
+@lru_cache(maxsize=None)
+def _load_gazetteer() -> Dict[str, Tuple[Tuple[str, Place], ...]]:
+    """
+    Load gazetteer.tsv into a table of lowercase phrase -> matching entries.
+
+    A phrase can match more than one entry ("new york" is a city and a
+    state, "la" is Los Angeles and Louisiana), so each maps to a tuple of
+    (kind, place) pairs.
+    """
+    table: Dict[str, List[Tuple[str, Place]]] = {}
+
+    with open(GAZETTEER_PATH, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            kind, name, state, country, aliases = (line.rstrip("\n").split("\t") + [""] * 5)[:5]
+
+            if kind == "city":
+                place = Place(name, state or None, country)
+            elif kind == "state":
+                place = Place(None, state, country)
+            else:
+                place = Place(None, None, country)
+
+            names = [name] + [a for a in aliases.split(",") if a]
+            if kind == "state":
+                names.append(state)
+            for phrase in names:
+                table.setdefault(_key(phrase), []).append((kind, place))
+
+    return {phrase: tuple(entries) for phrase, entries in table.items()}
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+def _scan(part: str, table: Dict[str, Tuple[Tuple[str, Place], ...]]) -> List[Tuple[Tuple[str, Place], ...]]:
+    """Find gazetteer entries in one part of a location string, longest phrase first."""
+    words = _WORD.findall(part)
+    found = []
+    i = 0
+    while i < len(words):
+        for n in range(min(MAX_PHRASE_WORDS, len(words) - i), 0, -1):
+            phrase = _key(" ".join(words[i:i + n]))
+            entries = table.get(phrase)
+            # Two-letter codes ("CA", "IN", "US") only count when written
+            # in capitals, so words like "in" and "me" don't match
+            if entries and len(phrase) <= 2 and not words[i].replace(".", "").isupper():
+                entries = None
+            if entries:
+                found.append(entries)
+                i += n
+                break
+        else:
+            i += 1
+    return found
+
+
+def _resolve(matches: List[Tuple[Tuple[Tuple[str, Place], ...], bool]]) -> Tuple[Place, ...]:
+    """
+    Turn a sequence of gazetteer matches into places.
+
+    A city starts a new place; a state or country that follows refines the
+    current place ("Portland, ME") or starts its own if it can't.
+
+    Args:
+        matches: (entries, is_code) pairs, where is_code marks a two-letter
+            code that was its own part of a longer location string
+    """
+    places: List[Place] = []
+    confirmed: List[bool] = []  # Whether each place's state was given explicitly
+
+    for entries, is_code in matches:
+        by_kind = {kind: place for kind, place in reversed(entries)}
+        current = places[-1] if places else None
+        is_open = bool(current and current.city and not confirmed[-1])
+
+        # A code like "LA" after an unknown city ("New Orleans, LA") is a
+        # state; only a bare "LA" means the city
+        if is_code and "state" in by_kind and not is_open:
+            by_kind.pop("city", None)
+        state = by_kind.get("state")
+
+        # A code equal to the city's own country ("Toronto, CA",
+        # "Bangalore, IN") is a country code, not a US state
+        if (is_open and state and "city" not in by_kind
+                and current.country != state.country and state.state == current.country):
+            continue
+
+        # "Portland, ME" and "Dublin, CA" override the city's default state
+        # and country, but a name that is also a city ("San Francisco,
+        # New York") only refines its own city
+        if (state and is_open
+                and ("city" not in by_kind or current.state == state.state)):
+            places[-1] = Place(current.city, state.state, state.country)
+            confirmed[-1] = True
+        elif "city" in by_kind:
+            places.append(by_kind["city"])
+            confirmed.append(False)
+        elif state:
+            if not (current and current.state == state.state):
+                places.append(state)
+                confirmed.append(True)
+        elif "country" in by_kind:
+            country = by_kind["country"]
+            if current and current.country in (None, country.country):
+                places[-1] = Place(current.city, current.state, country.country)
+            elif is_open:
+                # "Cambridge, UK": the country wins over the city's default,
+                # and the default's state no longer applies
+                places[-1] = Place(current.city, None, country.country)
+            else:
+                places.append(country)
+                confirmed.append(False)
+
+    return tuple(dict.fromkeys(places))
+
+
+@lru_cache(maxsize=4096)
+def normalize_location(raw: str) -> NormalizedLocation:
+    """
+    Parse a raw location string into structured places.
+
+    Args:
+        raw: Location as scraped, e.g. "SF / NYC" or "Remote (US)"
+
+    Returns:
+        The normalized location
+    """
+    table = _load_gazetteer()
+
+    parts = [part for part in _SEPARATORS.split(raw or "") if part and part.strip()]
+    matches = []
+    for part in parts:
+        is_code = len(parts) > 1 and len(_key(part)) <= 2
+        matches.extend((entries, is_code) for entries in _scan(part, table))
+    places = _resolve(matches)
+
+    remote = bool(_REMOTE.search(raw or ""))
+    hybrid = bool(_HYBRID.search(raw or ""))
+
+    regions = set()
+    for place in places:
+        if place.country:
+            regions.add(place.country)
+            if place.state:
+                regions.add(f"{place.country}-{place.state}")
+    if remote:
+        regions.add("REMOTE")
+    if hybrid:
+        regions.add("HYBRID")
+
+    return NormalizedLocation(places, remote, hybrid, frozenset(regions))
+
+
+def filter_regions(jobs: Iterable[Dict[str, Any]], regions: FrozenSet[str]) -> List[Dict[str, Any]]:
+    """
+    Keep jobs whose location falls in any of the target regions.
+
+    Args:
+        jobs: List of job dictionaries
+        regions: Target region codes, e.g. {"US-CA", "US-NY", "REMOTE"}
+
+    Returns:
+        Filtered list of jobs
+    """
+    regions = frozenset(r.upper() for r in regions)
+    return [
+        job for job in jobs
+        if normalize_location(job.get('location', '')).matches(regions)
+    ]
@@ -0,0 +1,270 @@
+"""
+Memory Watchdog for ATLAS Scrapers
+==================================
+Tracks Python RSS and headless browser PSS while scrapers run, so long
+multi-source runs stay inside a fixed memory envelope.
+
+Chromium's renderer, GPU and zygote processes share most of their pages,
+so summing their RSS counts shared memory once per process. The browser
+is measured with PSS instead, which splits each shared page between the
+processes using it. Where PSS isn't available (psutil off Linux, or no
+smaps_rollup) it falls back to RSS and the limits will trigger early.
+
+Without psutil or /proc (e.g. macOS without psutil installed) memory
+can't be read at all. The watchdog then warns once and turns off its
+memory limits; ATLAS_PAGES_PER_BROWSER still applies.
+
+Limits come from environment variables (all in MB, 0 disables the limit):
+    ATLAS_BROWSER_SOFT_MB     Recycle the browser between pages past this
+    ATLAS_BROWSER_HARD_MB     Abort the in-flight page, recycle, and re-queue it
+    ATLAS_PYTHON_SOFT_MB      Force a garbage collection past this
+    ATLAS_PAGES_PER_BROWSER   Recycle the browser after this many pages
+"""
+
+import asyncio
+import gc
+import os
+import time
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# Optional: psutil gives portable memory numbers; fall back to /proc on Linux
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Whether memory can be read at all on this host
+MEMORY_MEASURABLE = PSUTIL_AVAILABLE or os.path.isdir("/proc")
+
+
+def _env_mb(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+BROWSER_SOFT_LIMIT_MB = _env_mb("ATLAS_BROWSER_SOFT_MB", 1024)
+BROWSER_HARD_LIMIT_MB = _env_mb("ATLAS_BROWSER_HARD_MB", 1536)
+PYTHON_SOFT_LIMIT_MB = _env_mb("ATLAS_PYTHON_SOFT_MB", 512)
+PAGES_PER_BROWSER = _env_mb("ATLAS_PAGES_PER_BROWSER", 50)
+
+
+class MemoryLimitExceeded(Exception):
+    """Raised when the browser crosses the hard limit mid-page."""
+
+
+@dataclass
+class MemorySample:
+    """Python RSS and browser PSS taken after a page, in MB."""
+    url: str
+    python_mb: float
+    browser_mb: float
+    timestamp: float
+
+
+# =============================================================================
+# Memory Readers
+# =============================================================================
+
+def _proc_rss_mb(pid: int) -> float:
+    """Read VmRSS for a pid from /proc. Returns 0 if unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0.0
+
+
+def _proc_pss_mb(pid: int) -> float:
+    """Read Pss for a pid from /proc, falling back to VmRSS."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return _proc_rss_mb(pid)
+
+
+def _proc_children(pid: int) -> List[int]:
+    """Find all descendants of a pid by walking /proc."""
+    parents = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, so split after ")"
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    descendants = []
+    stack = [pid]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            descendants.append(child)
+            stack.append(child)
+    return descendants
+
+
+def python_rss_mb() -> float:
+    """RSS of this Python process in MB."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    return _proc_rss_mb(os.getpid())
+
+
+def browser_pss_mb() -> float:
+    """
+    Combined PSS of every child process in MB.
+
+    Playwright launches its driver and Chromium as descendants of this
+    process, so the child tree is the browser footprint.
+    """
+    if PSUTIL_AVAILABLE:
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                info = child.memory_full_info()
+                total += getattr(info, "pss", info.rss)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+    return sum(_proc_pss_mb(pid) for pid in _proc_children(os.getpid()))
+
+
+_warned_unmeasurable = False
+
+
+def _warn_unmeasurable():
+    global _warned_unmeasurable
+    if not _warned_unmeasurable:
+        _warned_unmeasurable = True
+        print("⚠️  Can't read memory usage (no psutil or /proc), memory limits are off. "
+              "Run: pip install psutil")
+
+
+# =============================================================================
+# Watchdog
+# =============================================================================
+
+class MemoryWatchdog:
+    """
+    Watches memory per page and decides when the browser must be recycled.
+
+    Scrapers call `guard()` around each page load and `after_page()` once
+    the page is done. `guard()` raises MemoryLimitExceeded if the browser
+    crosses the hard limit while the page is loading; `after_page()`
+    returns True when the browser should be recycled before the next page.
+    """
+
+    def __init__(
+        self,
+        browser_soft_mb: int = BROWSER_SOFT_LIMIT_MB,
+        browser_hard_mb: int = BROWSER_HARD_LIMIT_MB,
+        python_soft_mb: int = PYTHON_SOFT_LIMIT_MB,
+        pages_per_browser: int = PAGES_PER_BROWSER,
+        poll_interval: float = 1.0,
+    ):
+        self.browser_soft_mb = browser_soft_mb
+        self.browser_hard_mb = browser_hard_mb
+        self.python_soft_mb = python_soft_mb
+        self.pages_per_browser = pages_per_browser
+        self.poll_interval = poll_interval
+
+        if not MEMORY_MEASURABLE and (browser_soft_mb or browser_hard_mb or python_soft_mb):
+            _warn_unmeasurable()
+            self.browser_soft_mb = self.browser_hard_mb = self.python_soft_mb = 0
+
+        self.samples: List[MemorySample] = []
+        self.pages_since_recycle = 0
+        self.recycles = 0
+
+    async def guard(self, coro):
+        """
+        Await a page load, aborting it if the browser crosses the hard limit.
+
+        Args:
+            coro: The page load coroutine
+
+        Returns:
+            Whatever the coroutine returns
+
+        Raises:
+            MemoryLimitExceeded: If the hard limit was crossed mid-page
+        """
+        if not self.browser_hard_mb:
+            return await coro
+
+        page = asyncio.ensure_future(coro)
+        try:
+            while True:
+                done, _ = await asyncio.wait({page}, timeout=self.poll_interval)
+                if done:
+                    return page.result()
+
+                browser_mb = browser_pss_mb()
+                if browser_mb > self.browser_hard_mb:
+                    raise MemoryLimitExceeded(
+                        f"browser at {browser_mb:.0f} MB "
+                        f"(hard limit {self.browser_hard_mb} MB)"
+                    )
+        finally:
+            if not page.done():
+                page.cancel()
+                try:
+                    await page
+                except BaseException:
+                    pass
+
+    def after_page(self, url: str) -> bool:
+        """
+        Record memory for a finished page.
+
+        Args:
+            url: The page that was just scraped
+
+        Returns:
+            True if the browser should be recycled before the next page
+        """
+        python_mb = python_rss_mb()
+        browser_mb = browser_pss_mb()
+        self.samples.append(MemorySample(url, python_mb, browser_mb, time.time()))
+        self.pages_since_recycle += 1
+
+        if self.python_soft_mb and python_mb > self.python_soft_mb:
+            gc.collect()
+
+        if self.browser_soft_mb and browser_mb > self.browser_soft_mb:
+            return True
+        if self.pages_per_browser and self.pages_since_recycle >= self.pages_per_browser:
+            return True
+        return False
+
+    def recycled(self):
+        """Note that the browser was just restarted."""
+        self.pages_since_recycle = 0
+        self.recycles += 1
+
+    def peak(self) -> Tuple[float, float]:
+        """Peak (python_mb, browser_mb) seen across all pages."""
+        if not self.samples:
+            return (0.0, 0.0)
+        return (
+            max(s.python_mb for s in self.samples),
+            max(s.browser_mb for s in self.samples),
+        )
@@ -0,0 +1,256 @@
+"""
+Profiling Hooks for ATLAS Scrapers
+==================================
+Per-stage profiling for `--profile` runs of run_all.py and yc.py.
+
+Scrapers wrap each stage in `with stage("parse", self.SOURCE_NAME):`.
+That is a no-op until `enable()` installs a Profiler, which then records
+for every (scraper, stage) pair:
+
+    <scraper>.<stage>.pstats           cProfile stats (open with pstats/snakeviz)
+    <scraper>.<stage>.collapsed        Sampled stacks for flamegraph.pl/speedscope
+    <scraper>.<stage>.allocations.txt  Top allocators, from trace_allocations()
+    trace.json                         Stage timeline per asyncio task
+                                       (open in chrome://tracing or Perfetto)
+
+Stages may nest but are assumed to run one at a time on the main thread,
+which is how run_all.py drives the scrapers. Only one cProfile can run at
+a time, so an outer stage's pstats and stacks leave out its inner stages
+and pick up anything else the event loop runs meanwhile, such as writer
+tasks. Its trace.json span still covers the whole block.
+
+tracemalloc slows down the code it watches, so allocations are recorded
+in a separate pass (`trace_allocations()`) rather than during the stage
+whose timings are being compared.
+"""
+
+import asyncio
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# How many allocation sites to list per traced stage
+TOP_ALLOCATORS = 25
+
+# The profiler installed by enable(), if any
+_active: Optional["Profiler"] = None
+
+
+def enable(output_dir: str) -> "Profiler":
+    """Install a profiler that writes its reports to output_dir."""
+    global _active
+    _active = Profiler(output_dir)
+    return _active
+
+
+def disable() -> Optional["Profiler"]:
+    """Uninstall the active profiler, write its reports, and return it."""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.write_reports()
+    return profiler
+
+
+@contextmanager
+def stage(name: str, scraper: str = "run"):
+    """
+    Profile a block as one stage of a scraper run.
+
+    Args:
+        name: Stage name, e.g. "fetch" or "parse"
+        scraper: Scraper the stage belongs to
+    """
+    if _active is None:
+        yield
+        return
+    with _active.stage(name, scraper):
+        yield
+
+
+def trace_allocations(name: str, scraper: str, func, *args):
+    """
+    Run func(*args) again under tracemalloc and record its top allocators
+    as <scraper>.<name>.allocations.txt. Does nothing unless profiling.
+
+    Args:
+        name: Stage the allocations belong to, e.g. "parse"
+        scraper: Scraper the stage belongs to
+        func: The stage's work, e.g. self.parse_jobs
+    """
+    if _active is not None:
+        _active.trace_allocations(name, scraper, func, *args)
+
+
+def _task_name() -> str:
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task.get_name() if task else "main"
+
+
+def _safe_filename(text: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in text)
+
+
+class _StackSampler(threading.Thread):
+    """Samples the main thread's stack and counts it under the current stage."""
+
+    def __init__(self, profiler: "Profiler", interval: float = 0.005):
+        super().__init__(name="atlas-stack-sampler", daemon=True)
+        self.profiler = profiler
+        self.interval = interval
+        self.main_id = threading.main_thread().ident
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            key = self.profiler.current_key()
+            frame = sys._current_frames().get(self.main_id)
+            if key is None or frame is None:
+                continue
+
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.profiler.stacks[key][";".join(reversed(names))] += 1
+
+
+class Profiler:
+    """Collects cProfile stats, sampled stacks, allocations and a stage timeline."""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.profiles: Dict[Tuple[str, str], cProfile.Profile] = {}
+        self.stacks: Dict[Tuple[str, str], Counter] = {}
+        self.allocations: Dict[Tuple[str, str], List[str]] = {}
+        self.events: List[dict] = []
+
+        self._stack: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._sampler = _StackSampler(self)
+        self._sampler.start()
+
+    def current_key(self) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            return self._stack[-1] if self._stack else None
+
+    def _push(self, key: Tuple[str, str]) -> Optional[cProfile.Profile]:
+        """Make key the current stage, pausing the enclosing stage's cProfile."""
+        self.stacks.setdefault(key, Counter())
+
+        # Only one cProfile can be active at a time
+        parent = self.profiles.get(self._stack[-1]) if self._stack else None
+        if parent is not None:
+            parent.disable()
+        with self._lock:
+            self._stack.append(key)
+        return parent
+
+    def _pop(self, parent: Optional[cProfile.Profile]):
+        with self._lock:
+            self._stack.pop()
+        if parent is not None:
+            parent.enable()
+
+    @contextmanager
+    def stage(self, name: str, scraper: str):
+        key = (scraper, name)
+        profile = self.profiles.setdefault(key, cProfile.Profile())
+        parent = self._push(key)
+
+        task = _task_name()
+        begin = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            end = time.perf_counter()
+            self._pop(parent)
+
+            self.events.append({
+                "name": name,
+                "cat": scraper,
+                "ph": "X",
+                "ts": (begin - self._start) * 1e6,
+                "dur": (end - begin) * 1e6,
+                "pid": os.getpid(),
+                "tid": task,
+            })
+
+    def trace_allocations(self, name: str, scraper: str, func, *args):
+        # Own key so the sampler and cProfile keep this pass out of the stage
+        parent = self._push((scraper, f"{name}-allocations"))
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(25)
+        else:
+            tracemalloc.reset_peak()
+        result = None
+        try:
+            # Hold the result so its allocations are still live in the snapshot
+            result = func(*args)
+        finally:
+            self._record_allocations((scraper, name))
+            del result
+            if started_tracing:
+                tracemalloc.stop()
+            self._pop(parent)
+
+    def _record_allocations(self, key: Tuple[str, str]):
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, threading.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ])
+
+        lines = [f"Peak traced memory: {peak / 1024:.1f} KiB", ""]
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATORS]:
+            lines.append(str(stat))
+        self.allocations.setdefault(key, []).extend(lines + [""])
+
+    def write_reports(self):
+        """Stop sampling and write every report to the output directory."""
+        self._sampler.stopped.set()
+        self._sampler.join()
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        def base(key: Tuple[str, str]) -> str:
+            return os.path.join(self.output_dir, ".".join(_safe_filename(k) for k in key))
+
+        for key, profile in self.profiles.items():
+            profile.dump_stats(f"{base(key)}.pstats")
+
+            with open(f"{base(key)}.collapsed", "w") as f:
+                for stack, count in self.stacks[key].most_common():
+                    f.write(f"{stack} {count}\n")
+
+        for key, lines in self.allocations.items():
+            with open(f"{base(key)}.allocations.txt", "w") as f:
+                f.write("\n".join(lines))
+
+        with open(os.path.join(self.output_dir, "trace.json"), "w") as f:
+            json.dump({"traceEvents": self.events}, f)
+
+        print(f"\n📈 PROFILE ({self.output_dir})")
+        print("=" * 60)
+        totals = Counter()
+        for event in self.events:
+            totals[(event["cat"], event["name"])] += event["dur"] / 1e6
+        for (scraper, name), seconds in totals.most_common():
+            print(f"   {scraper} / {name}: {seconds:.3f}s")
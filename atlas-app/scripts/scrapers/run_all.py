@@ -7,17 +7,28 @@ Usage:
     python run_all.py              # Scrape and print results
     python run_all.py --save       # Scrape and save to Supabase
     python run_all.py --test       # Test mode (just YC, no save)
+    python run_all.py --profile    # Write per-stage profiles to profiles/
+    python run_all.py --regions US-CA,US-NY,REMOTE   # Filter to these regions
+
+Memory limits for the browser watchdog are set with ATLAS_BROWSER_SOFT_MB,
+ATLAS_BROWSER_HARD_MB, ATLAS_PYTHON_SOFT_MB and ATLAS_PAGES_PER_BROWSER
+(see memory.py).
 """
 
 import asyncio
 import argparse
 import json
 import os
+import threading
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 # Import scrapers
 from yc import YCombinatorScraper
+from writer import WriteBehindQueue, save_batch
+from locations import parse_regions
+import profiling
+from profiling import stage
 
 # Optional: Supabase client
 try:
@@ -51,10 +62,14 @@ SCRAPERS = [
 # Main Functions
 # =============================================================================
 
-async def scrape_all() -> List[Dict[str, Any]]:
+async def scrape_all(sink: Optional[WriteBehindQueue] = None) -> List[Dict[str, Any]]:
     """
     Run all scrapers and collect results.
 
+    Args:
+        sink: Optional write-behind queue that receives each scraper's
+            results as soon as it finishes
+
     Returns:
         Combined list of all opportunities
     """
@@ -65,11 +80,21 @@ async def scrape_all() -> List[Dict[str, Any]]:
 
     for scraper in SCRAPERS:
         try:
-            if hasattr(scraper, 'scrape_internships'):
-                jobs = await scraper.scrape_internships()
-            else:
-                # Generic scrape method
-                jobs = await scraper.scrape()
+            # One browser per scraper, recycled by the memory watchdog.
+            # Profiled as "other": the scraper's own stages are split out
+            with stage("other", scraper.SOURCE_NAME):
+                async with scraper:
+                    if hasattr(scraper, 'scrape_internships'):
+                        jobs = await scraper.scrape_internships()
+                    else:
+                        # Generic scrape method
+                        jobs = await scraper.scrape()
+
+                    # Queue while the browser is still open, so writes
+                    # overlap with its shutdown and the next scraper
+                    if sink is not None:
+                        with stage("enqueue", scraper.SOURCE_NAME):
+                            await sink.put_many(jobs)
 
             all_opportunities.extend(jobs)
             print(f"   ✅ {scraper.SOURCE_NAME}: {len(jobs)} opportunities")
@@ -77,6 +102,10 @@ async def scrape_all() -> List[Dict[str, Any]]:
         except Exception as e:
             print(f"   ❌ {scraper.SOURCE_NAME} failed: {e}")
 
+        python_mb, browser_mb = scraper.watchdog.peak()
+        print(f"   🧠 Peak memory: python {python_mb:.0f} MB, browser {browser_mb:.0f} MB, "
+              f"{scraper.watchdog.recycles} browser recycles")
+
     print("=" * 50)
     print(f"📊 Total: {len(all_opportunities)} opportunities scraped")
 
@@ -101,50 +130,38 @@ def save_to_json(opportunities: List[Dict[str, Any]], filename: str = None):
     print(f"💾 Saved to {filename}")
 
 
-async def save_to_supabase(opportunities: List[Dict[str, Any]]) -> int:
-    """
-    Save opportunities to Supabase database.
+# Each writer thread gets its own Supabase client
+_thread_state = threading.local()
 
-    Args:
-        opportunities: List of opportunity dictionaries
+
+def _supabase_client() -> "Client":
+    if not hasattr(_thread_state, "client"):
+        _thread_state.client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _thread_state.client
+
+
+def write_batch_to_supabase(batch: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Save a batch with this thread's Supabase client (see writer.save_batch)."""
+    return save_batch(_supabase_client(), batch)
+
+
+def create_supabase_writer() -> Optional[WriteBehindQueue]:
+    """
+    Create a write-behind queue that saves to Supabase.
 
     Returns:
-        Number of opportunities inserted
+        The queue, or None if Supabase isn't installed or configured
     """
     if not SUPABASE_AVAILABLE:
         print("❌ Supabase library not installed")
-        return 0
+        return None
 
     if not SUPABASE_URL or not SUPABASE_KEY:
         print("❌ Supabase credentials not configured")
         print("   Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_KEY")
-        return 0
-
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    inserted = 0
-
-    print("\n📤 Uploading to Supabase...")
-
-    for opp in opportunities:
-        try:
-            # Check if opportunity already exists (by URL)
-            existing = supabase.table("opportunities").select("id").eq("url", opp.get("url", "")).execute()
-
-            if existing.data:
-                # Update existing
-                supabase.table("opportunities").update(opp).eq("url", opp["url"]).execute()
-                print(f"   🔄 Updated: {opp.get('company', 'Unknown')}")
-            else:
-                # Insert new
-                supabase.table("opportunities").insert(opp).execute()
-                inserted += 1
-                print(f"   ✅ Inserted: {opp.get('company', 'Unknown')} - {opp.get('title', 'Unknown')}")
-
-        except Exception as e:
-            print(f"   ❌ Failed to save {opp.get('company', 'Unknown')}: {e}")
+        return None
 
-    print(f"\n✨ Inserted {inserted} new opportunities")
-    return inserted
+    return WriteBehindQueue(write_batch_to_supabase)
 
 
 def print_summary(opportunities: List[Dict[str, Any]]):
@@ -173,10 +190,37 @@ async def main():
     parser.add_argument("--save", action="store_true", help="Save to Supabase")
     parser.add_argument("--json", action="store_true", help="Save to JSON file")
     parser.add_argument("--test", action="store_true", help="Test mode (limited scraping)")
+    parser.add_argument("--profile", nargs="?", const="", metavar="DIR",
+                        help="Profile each stage and write reports to DIR")
+    parser.add_argument("--regions", metavar="CODES",
+                        help="Comma separated regions to keep, e.g. US-CA,US-NY,REMOTE "
+                             "(default: $ATLAS_REGIONS or US-CA,REMOTE,HYBRID)")
     args = parser.parse_args()
 
-    # Run scrapers
-    opportunities = await scrape_all()
+    if args.regions:
+        for scraper in SCRAPERS:
+            scraper.regions = parse_regions(args.regions)
+
+    if args.profile is not None:
+        profiling.enable(args.profile or f"profiles/{datetime.now():%Y-%m-%d_%H%M%S}")
+    try:
+        await run(args)
+    finally:
+        profiling.disable()
+
+
+async def run(args: argparse.Namespace):
+    """Scrape, summarize and save according to the parsed CLI arguments."""
+    # Save to Supabase in the background while scrapers run
+    writer = create_supabase_writer() if args.save else None
+
+    if writer is None:
+        opportunities = await scrape_all()
+    else:
+        print("\n📤 Uploading to Supabase as scrapers finish...")
+        async with writer:
+            opportunities = await scrape_all(sink=writer)
+        print(f"\n✨ Inserted {writer.inserted} new opportunities, {writer.failed} failed")
 
     if not opportunities:
         print("\n⚠️  No opportunities found. Check your internet connection.")
@@ -189,9 +233,6 @@ async def main():
     if args.json or not args.save:
         save_to_json(opportunities)
 
-    if args.save:
-        await save_to_supabase(opportunities)
-
     print("\n✅ Done!")
 
 
@@ -0,0 +1,109 @@
+"""
+Tests for location normalization and region filtering.
+
+Run from this directory with: python -m pytest test_locations.py
+"""
+
+import pytest
+
+from locations import filter_regions, normalize_location, parse_regions
+
+CALIFORNIA = {"US-CA", "REMOTE", "HYBRID"}
+
+
+@pytest.mark.parametrize("raw, regions", [
+    # Plain city, state and country forms
+    ("San Francisco, CA", {"US", "US-CA"}),
+    ("Palo Alto, California, United States", {"US", "US-CA"}),
+    ("Chicago", {"US", "US-IL"}),
+    ("Toronto, ON, Canada", {"CA", "CA-ON"}),
+    ("London, UK", {"GB"}),
+    ("", set()),
+
+    # Several places in one string
+    ("SF / NYC", {"US", "US-CA", "US-NY"}),
+    ("Menlo Park, CA or New York, NY", {"US", "US-CA", "US-NY"}),
+    ("San Francisco, New York", {"US", "US-CA", "US-NY"}),
+    ("Albany, New York", {"US", "US-NY"}),
+    ("Seattle, Washington", {"US", "US-WA"}),
+    ("Portland, ME", {"US", "US-ME"}),
+
+    # Remote and hybrid
+    ("Remote (US)", {"US", "REMOTE"}),
+    ("Remote (Anywhere)", {"REMOTE"}),
+    ("Hybrid - Austin, TX", {"US", "US-TX", "HYBRID"}),
+    ("Mountain View, CA; Remote", {"US", "US-CA", "REMOTE"}),
+
+    # LA: Los Angeles on its own, Louisiana after another city
+    ("LA", {"US", "US-CA"}),
+    ("SF / LA", {"US", "US-CA"}),
+    ("Los Angeles, CA", {"US", "US-CA"}),
+    ("New Orleans, LA", {"US", "US-LA"}),
+    ("Baton Rouge, LA", {"US", "US-LA"}),
+
+    # OR: Oregon, not the conjunction in any case
+    ("Portland, OR", {"US", "US-OR"}),
+    ("Portland, OR / Remote", {"US", "US-OR", "REMOTE"}),
+    ("Remote OR San Francisco", {"US", "US-CA", "REMOTE"}),
+    ("Remote, US OR Canada", {"US", "CA", "REMOTE"}),
+
+    # IN: Indiana only as a capitalized code for a US place
+    ("Indianapolis, IN", {"US", "US-IN"}),
+    ("Remote in San Francisco", {"US", "US-CA", "REMOTE"}),
+    ("Bangalore, IN", {"IN"}),
+
+    # CA: California, or Canada after a Canadian city
+    ("Sacramento, CA", {"US", "US-CA"}),
+    ("Toronto, CA", {"CA", "CA-ON"}),
+
+    # Lowercase words are never state codes
+    ("in", set()),
+    ("me", set()),
+
+    # Same-name cities: an explicit state or country beats the gazetteer
+    ("Dublin, CA", {"US", "US-CA"}),
+    ("Paris, TX", {"US", "US-TX"}),
+    ("Vancouver, WA", {"US", "US-WA"}),
+    ("London, ON", {"CA", "CA-ON"}),
+    ("Cambridge, UK", {"GB"}),
+])
+def test_normalize_location_regions(raw, regions):
+    assert normalize_location(raw).regions == regions
+
+
+@pytest.mark.parametrize("raw", [
+    # The keyword list filter_california() used before the gazetteer
+    "California", "San Francisco", "SF", "Los Angeles", "LA", "San Jose",
+    "San Diego", "Palo Alto", "Mountain View", "Sunnyvale", "Santa Clara",
+    "Cupertino", "Menlo Park", "Redwood City", "Oakland", "Berkeley",
+    "Irvine", "Santa Monica", "Pasadena", "Sacramento", "Remote", "Hybrid",
+    # Same name as a city elsewhere in the gazetteer
+    "Dublin, CA",
+])
+def test_old_california_keywords_still_match(raw):
+    assert normalize_location(raw).matches(frozenset(CALIFORNIA))
+
+
+@pytest.mark.parametrize("raw", [
+    "Chicago, IL", "New Orleans, LA", "Portland, OR", "Toronto, CA", "Indianapolis, IN",
+])
+def test_non_california_locations_are_filtered_out(raw):
+    assert not normalize_location(raw).matches(frozenset(CALIFORNIA))
+
+
+def test_filter_regions_one_pass_over_several_states():
+    jobs = [
+        {"location": "Austin, TX"},
+        {"location": "SF"},
+        {"location": "Chicago"},
+        {"location": "Remote OR San Francisco"},
+        {},
+    ]
+    kept = filter_regions(jobs, parse_regions("us-tx, US-OR"))
+    assert kept == [{"location": "Austin, TX"}]
+
+
+def test_is_remote_includes_hybrid():
+    assert normalize_location("Hybrid - New York").is_remote
+    assert normalize_location("Remote").is_remote
+    assert not normalize_location("New York, NY").is_remote
@@ -0,0 +1,187 @@
+"""
+Tests for the memory watchdog and BaseScraper's browser recycling.
+
+Run from this directory with: python -m pytest test_memory.py
+"""
+
+import asyncio
+
+import pytest
+
+import memory
+from memory import MemoryLimitExceeded, MemoryWatchdog
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeMemory:
+    """Stands in for browser_pss_mb, returning readings in order (last repeats)."""
+
+    def __init__(self, *readings):
+        self.readings = list(readings)
+
+    def __call__(self):
+        if len(self.readings) > 1:
+            return self.readings.pop(0)
+        return self.readings[0]
+
+
+@pytest.fixture
+def browser_mb(monkeypatch):
+    def install(*readings):
+        monkeypatch.setattr(memory, "browser_pss_mb", FakeMemory(*readings))
+    install(10)
+    return install
+
+
+def watchdog(**limits):
+    options = dict(browser_soft_mb=100, browser_hard_mb=200, python_soft_mb=0,
+                   pages_per_browser=0, poll_interval=0.01)
+    options.update(limits)
+    return MemoryWatchdog(**options)
+
+
+# =============================================================================
+# MemoryWatchdog
+# =============================================================================
+
+def test_guard_returns_page_result_under_hard_limit(browser_mb):
+    async def page():
+        await asyncio.sleep(0.05)
+        return "md"
+
+    assert run(watchdog().guard(page())) == "md"
+
+
+def test_guard_aborts_page_over_hard_limit(browser_mb):
+    browser_mb(500)
+    cancelled = []
+
+    async def page():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with pytest.raises(MemoryLimitExceeded):
+        run(watchdog().guard(page()))
+    assert cancelled == [True]
+
+
+def test_after_page_asks_for_recycle_past_soft_limit(browser_mb):
+    dog = watchdog()
+    assert dog.after_page("a") is False
+
+    browser_mb(150)
+    assert dog.after_page("b") is True
+    assert [s.url for s in dog.samples] == ["a", "b"]
+    assert dog.peak()[1] == 150
+
+
+def test_after_page_asks_for_recycle_by_page_count(browser_mb):
+    dog = watchdog(pages_per_browser=2)
+    assert dog.after_page("a") is False
+    assert dog.after_page("b") is True
+
+    dog.recycled()
+    assert dog.after_page("c") is False
+    assert dog.recycles == 1
+
+
+def test_limits_turn_off_with_one_warning_when_memory_is_unreadable(monkeypatch, capsys):
+    monkeypatch.setattr(memory, "MEMORY_MEASURABLE", False)
+    monkeypatch.setattr(memory, "_warned_unmeasurable", False)
+
+    first, second = watchdog(pages_per_browser=5), watchdog()
+    assert (first.browser_soft_mb, first.browser_hard_mb, first.python_soft_mb) == (0, 0, 0)
+    assert first.pages_per_browser == 5
+    assert second.browser_hard_mb == 0
+    assert capsys.readouterr().out.count("memory limits are off") == 1
+
+
+# =============================================================================
+# BaseScraper
+# =============================================================================
+
+class FakeResult:
+    success = True
+    markdown = "md"
+    error_message = None
+
+
+class FakeCrawler:
+    """AsyncWebCrawler stand-in that counts browser launches."""
+
+    launches = 0
+
+    def __init__(self, config=None):
+        pass
+
+    async def start(self):
+        FakeCrawler.launches += 1
+
+    async def close(self):
+        pass
+
+    async def arun(self, url, config):
+        await asyncio.sleep(0.03)
+        return FakeResult()
+
+
+@pytest.fixture
+def scraper(monkeypatch, browser_mb):
+    pytest.importorskip("crawl4ai")
+    import base
+
+    monkeypatch.setattr(base, "AsyncWebCrawler", FakeCrawler)
+    FakeCrawler.launches = 0
+    scraper = base.BaseScraper()
+    scraper.watchdog = watchdog()
+    return scraper
+
+
+def test_hard_limit_requeues_page_in_fresh_browser(scraper, browser_mb):
+    # Over the hard limit during the first attempt, fine afterwards
+    browser_mb(500, 10)
+
+    async def main():
+        async with scraper:
+            return await scraper.scrape("a")
+
+    assert run(main()) == "md"
+    assert scraper.watchdog.recycles == 1
+    assert FakeCrawler.launches == 2
+
+
+def test_recycle_waits_for_next_fetch(scraper):
+    scraper.watchdog.pages_per_browser = 1
+
+    async def main():
+        async with scraper:
+            await scraper.scrape("a")
+            # Requested after the page, not done yet
+            assert (scraper.watchdog.recycles, FakeCrawler.launches) == (0, 1)
+            await scraper.scrape("b")
+            assert (scraper.watchdog.recycles, FakeCrawler.launches) == (1, 2)
+
+    run(main())
+    # No browser launched after the last page
+    assert FakeCrawler.launches == 2
+
+
+def test_gives_up_after_max_requeues(scraper, browser_mb):
+    import base
+
+    browser_mb(500)
+
+    async def main():
+        async with scraper:
+            await scraper.scrape("a")
+
+    with pytest.raises(Exception, match="memory limit"):
+        run(main())
+    # One launch per attempt, none after the last failure
+    assert FakeCrawler.launches == base.MAX_REQUEUES + 1
@@ -0,0 +1,236 @@
+"""
+Tests for the write-behind queue and Supabase batch saving.
+
+Run from this directory with: python -m pytest test_writer.py
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from writer import WriteBehindQueue, save_batch
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class RecordingWriter:
+    """write_batch stand-in that records batches and catches same-URL overlap."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batches = []
+        self.overlaps = []
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, batch):
+        urls = {opp["url"] for opp in batch}
+        with self._lock:
+            self.overlaps.extend(urls & self._in_flight)
+            self._in_flight |= urls
+            self.batches.append(list(batch))
+        time.sleep(self.delay)
+        with self._lock:
+            self._in_flight -= urls
+        return (len(batch), 0)
+
+
+# =============================================================================
+# WriteBehindQueue
+# =============================================================================
+
+def test_same_url_never_written_by_two_workers_at_once():
+    write = RecordingWriter(delay=0.01)
+    opps = [{"url": f"u{i % 7}"} for i in range(200)] + [{"url": ""}] * 20
+
+    async def main():
+        async with WriteBehindQueue(write, batch_size=5, workers=4, linger=0.01) as queue:
+            await queue.put_many(opps)
+        return queue
+
+    queue = run(main())
+    assert write.overlaps == []
+    assert queue.inserted == len(opps)
+
+
+def test_batches_fill_up_to_batch_size():
+    write = RecordingWriter()
+
+    async def main():
+        async with WriteBehindQueue(write, batch_size=10, workers=1, linger=0.2) as queue:
+            await queue.put_many([{"url": str(i)} for i in range(25)])
+
+    run(main())
+    assert [len(b) for b in write.batches] == [10, 10, 5]
+
+
+def test_partial_batch_is_written_after_linger():
+    write = RecordingWriter()
+
+    async def main():
+        async with WriteBehindQueue(write, batch_size=10, workers=1, linger=0.05) as queue:
+            await queue.put_many([{"url": str(i)} for i in range(3)])
+            await asyncio.sleep(0.3)
+            # Written before the queue was closed
+            assert [len(b) for b in write.batches] == [3]
+
+    run(main())
+
+
+def test_put_waits_when_writers_are_behind():
+    release = threading.Event()
+
+    def blocked_write(batch):
+        release.wait(5)
+        return (len(batch), 0)
+
+    async def main():
+        queue = WriteBehindQueue(blocked_write, batch_size=1, max_pending=2, workers=1, linger=0)
+        async with queue:
+            # One item is held by the blocked writer, two fill the queue
+            for i in range(3):
+                await asyncio.wait_for(queue.put({"url": str(i)}), 1)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(queue.put({"url": "full"}), 0.1)
+            release.set()
+            await queue.put({"url": "last"})
+        return queue
+
+    queue = run(main())
+    assert queue.inserted == 4
+
+
+def test_queue_flushes_when_block_raises():
+    write = RecordingWriter()
+
+    async def main():
+        async with WriteBehindQueue(write, batch_size=50, workers=2, linger=1.0) as queue:
+            await queue.put_many([{"url": str(i)} for i in range(10)])
+            raise ValueError("scraper blew up")
+
+    with pytest.raises(ValueError):
+        run(main())
+    assert sum(len(b) for b in write.batches) == 10
+
+
+def test_crashing_write_batch_counts_whole_batch_as_failed():
+    def crash(batch):
+        raise RuntimeError("db down")
+
+    async def main():
+        async with WriteBehindQueue(crash, batch_size=10, workers=1, linger=0.01) as queue:
+            await queue.put_many([{"url": str(i)} for i in range(4)])
+        return queue
+
+    queue = run(main())
+    assert (queue.inserted, queue.failed) == (0, 4)
+
+
+# =============================================================================
+# save_batch
+# =============================================================================
+
+class StubQuery:
+    def __init__(self, client):
+        self.client = client
+        self.op = None
+        self.data = None
+        self.urls = None
+        self.bulk = False
+
+    def select(self, *columns):
+        self.op = "select"
+        return self
+
+    def in_(self, column, values):
+        self.urls = set(values)
+        self.bulk = True
+        return self
+
+    def eq(self, column, value):
+        self.urls = {value}
+        return self
+
+    def insert(self, data):
+        self.op, self.data = "insert", data
+        return self
+
+    def update(self, data):
+        self.op, self.data = "update", data
+        return self
+
+    def execute(self):
+        return self.client.execute(self)
+
+
+class StubResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class StubClient:
+    """Just enough of supabase-py's query builder for save_batch."""
+
+    def __init__(self, existing=(), bad_titles=(), fail_bulk_lookup=False):
+        self.rows = {url: {"url": url} for url in existing}
+        self.bad_titles = set(bad_titles)
+        self.fail_bulk_lookup = fail_bulk_lookup
+        self.updated = []
+
+    def table(self, name):
+        assert name == "opportunities"
+        return StubQuery(self)
+
+    def execute(self, query):
+        if query.op == "select":
+            if query.bulk and self.fail_bulk_lookup:
+                raise RuntimeError("lookup timed out")
+            return StubResult([{"url": u, "id": 1} for u in query.urls if u in self.rows])
+        if query.op == "update":
+            self.updated.append(query.data["url"])
+            return StubResult([])
+
+        rows = query.data if isinstance(query.data, list) else [query.data]
+        if any(row.get("title") in self.bad_titles for row in rows):
+            raise RuntimeError("row rejected")
+        for row in rows:
+            self.rows[row["url"]] = row
+        return StubResult(rows)
+
+
+def test_save_batch_inserts_new_and_updates_existing():
+    client = StubClient(existing=["old"])
+    batch = [{"url": "old", "title": "t"}, {"url": "new", "title": "t"}]
+
+    assert save_batch(client, batch) == (1, 0)
+    assert client.updated == ["old"]
+    assert set(client.rows) == {"old", "new"}
+
+
+def test_save_batch_retries_rows_when_bulk_insert_fails():
+    client = StubClient(bad_titles=["BAD"])
+    batch = [{"url": str(i), "title": "BAD" if i == 3 else "t"} for i in range(10)]
+
+    assert save_batch(client, batch) == (9, 1)
+    assert "3" not in client.rows
+
+
+def test_save_batch_saves_row_by_row_when_lookup_fails():
+    client = StubClient(existing=["old"], fail_bulk_lookup=True)
+    batch = [{"url": "old", "title": "t"}, {"url": "new", "title": "t"}]
+
+    assert save_batch(client, batch) == (1, 0)
+    assert client.updated == ["old"]
+    assert "new" in client.rows
+
+
+def test_save_batch_keeps_last_duplicate_url():
+    client = StubClient()
+    batch = [{"url": "", "title": "first"}, {"url": "", "title": "second"}]
+
+    assert save_batch(client, batch) == (1, 0)
+    assert client.rows[""]["title"] == "second"
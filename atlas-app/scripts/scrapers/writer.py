@@ -0,0 +1,229 @@
+"""
+Write-Behind Queue for ATLAS
+============================
+Persists opportunities in the background while scrapers keep running.
+
+Scrapers `put()` opportunities into a bounded queue. Worker tasks drain it
+in batches and hand each batch to a blocking write function on a thread
+pool, so database round trips overlap with browser time. When the queue is
+full, `put()` waits, which slows scraping down to what the database can take.
+
+Each opportunity is routed to a fixed writer by its URL, so two writers
+never check-then-insert the same URL at the same time.
+
+`save_batch()` is the Supabase write used by run_all.py.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Any, Optional, Tuple
+
+# Marks the end of the stream for one worker
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Bounded async queue drained in batches by background writers.
+
+    Use as `async with WriteBehindQueue(write_batch) as queue:` so every
+    queued opportunity is flushed before the block exits, even on errors.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Dict[str, Any]]], Tuple[int, int]],
+        batch_size: int = 50,
+        max_pending: int = 500,
+        workers: int = 2,
+        linger: float = 0.5,
+    ):
+        """
+        Args:
+            write_batch: Blocking function that saves a batch and returns
+                (rows inserted, rows failed). Runs on a worker thread.
+            batch_size: Most opportunities written in one call
+            max_pending: Total queue size at which `put()` starts waiting
+            workers: Number of concurrent writers
+            linger: Seconds a writer waits to fill a batch before writing
+        """
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.workers = workers
+        self.linger = linger
+
+        self.inserted = 0
+        self.failed = 0
+
+        # One queue per writer; put() picks the queue by URL
+        self._queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=max(1, max_pending // workers)) for _ in range(workers)
+        ]
+        self._executor = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def start(self):
+        """Spawn the writer tasks and their thread pool."""
+        if self._tasks:
+            return
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="atlas-writer"
+        )
+        self._tasks = [
+            asyncio.create_task(self._worker(queue)) for queue in self._queues
+        ]
+
+    async def put(self, opportunity: Dict[str, Any]):
+        """Queue one opportunity, waiting if its writer is behind."""
+        queue = self._queues[hash(opportunity.get("url", "")) % self.workers]
+        await queue.put(opportunity)
+
+    async def put_many(self, opportunities: List[Dict[str, Any]]):
+        """Queue several opportunities, waiting if their writers are behind."""
+        for opp in opportunities:
+            await self.put(opp)
+
+    async def close(self):
+        """Flush everything still queued, then stop the writers."""
+        if not self._tasks:
+            return
+        for queue in self._queues:
+            await queue.put(_STOP)
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    async def _next_batch(self, queue: asyncio.Queue) -> tuple:
+        """
+        Wait for a batch of opportunities from one writer's queue.
+
+        Returns:
+            Tuple of (batch, stopped) where stopped means the queue is closed
+        """
+        batch = [await queue.get()]
+        if batch[0] is _STOP:
+            return ([], True)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.linger
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                return (batch, True)
+            batch.append(item)
+
+        return (batch, False)
+
+    async def _worker(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        stopped = False
+        while not stopped:
+            batch, stopped = await self._next_batch(queue)
+            if not batch:
+                continue
+            try:
+                inserted, failed = await loop.run_in_executor(
+                    self._executor, self.write_batch, batch
+                )
+            except Exception as e:
+                # write_batch handles row errors itself; this is a crash
+                self.failed += len(batch)
+                print(f"   ❌ Failed to save batch of {len(batch)}: {e}")
+            else:
+                self.inserted += inserted
+                self.failed += failed
+
+
+# =============================================================================
+# Supabase
+# =============================================================================
+
+def _save_one(supabase, opp: Dict[str, Any], exists: Optional[bool] = None) -> Optional[bool]:
+    """
+    Update or insert one opportunity, checking by URL if exists isn't known.
+
+    Returns:
+        True if inserted, False if updated, None if it failed
+    """
+    try:
+        if exists is None:
+            # Check if opportunity already exists (by URL)
+            existing = supabase.table("opportunities").select("id").eq("url", opp.get("url", "")).execute()
+            exists = bool(existing.data)
+
+        if exists:
+            supabase.table("opportunities").update(opp).eq("url", opp.get("url", "")).execute()
+            print(f"   🔄 Updated: {opp.get('company', 'Unknown')}")
+            return False
+
+        supabase.table("opportunities").insert(opp).execute()
+        print(f"   ✅ Inserted: {opp.get('company', 'Unknown')} - {opp.get('title', 'Unknown')}")
+        return True
+
+    except Exception as e:
+        print(f"   ❌ Failed to save {opp.get('company', 'Unknown')}: {e}")
+        return None
+
+
+def save_batch(supabase, batch: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Save a batch of opportunities to Supabase. Blocking; runs on a writer thread.
+
+    Existing URLs are looked up in one query and new rows inserted in one
+    call. If either call fails, the affected rows are retried one by one
+    so a single bad row doesn't lose the rest of the batch.
+
+    Args:
+        supabase: Supabase client owned by the calling thread
+        batch: List of opportunity dictionaries
+
+    Returns:
+        Tuple of (opportunities inserted, opportunities that failed)
+    """
+    # Last one wins if a URL shows up twice in the batch
+    by_url = {opp.get("url", ""): opp for opp in batch}
+
+    try:
+        existing = supabase.table("opportunities").select("url").in_("url", list(by_url)).execute()
+        existing_urls = {row["url"] for row in existing.data}
+    except Exception as e:
+        print(f"   ⚠️  Batch lookup failed ({e}), saving one by one")
+        results = [_save_one(supabase, opp) for opp in by_url.values()]
+        return (results.count(True), results.count(None))
+
+    inserted = failed = 0
+    new_opps = []
+    for url, opp in by_url.items():
+        if url in existing_urls:
+            if _save_one(supabase, opp, exists=True) is None:
+                failed += 1
+        else:
+            new_opps.append(opp)
+
+    if new_opps:
+        try:
+            supabase.table("opportunities").insert(new_opps).execute()
+            for opp in new_opps:
+                print(f"   ✅ Inserted: {opp.get('company', 'Unknown')} - {opp.get('title', 'Unknown')}")
+            inserted += len(new_opps)
+        except Exception as e:
+            print(f"   ⚠️  Batch insert failed ({e}), inserting one by one")
+            results = [_save_one(supabase, opp, exists=False) for opp in new_opps]
+            inserted += results.count(True)
+            failed += results.count(None)
+
+    return (inserted, failed)
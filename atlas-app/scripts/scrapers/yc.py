@@ -7,6 +7,7 @@ Scrapes internship listings from workatastartup.com
 import re
 from typing import List, Dict, Any
 from base import BaseScraper
+from profiling import stage, trace_allocations
 
 class YCombinatorScraper(BaseScraper):
     """Scraper for Y Combinator's Work at a Startup job board."""
@@ -25,17 +26,34 @@ class YCombinatorScraper(BaseScraper):
         print(f"🔍 Scraping {self.SOURCE_NAME} internships...")
 
         try:
-            markdown = await self.scrape(self.INTERNSHIP_URL)
-            jobs = self.parse_jobs(markdown)
-            ca_jobs = self.filter_california(jobs)
-
-            print(f"   Found {len(jobs)} total, {len(ca_jobs)} in California")
-            return [self.to_atlas_format(j) for j in ca_jobs]
+            with stage("fetch", self.SOURCE_NAME):
+                markdown = await self.scrape(self.INTERNSHIP_URL)
+            return self.process_markdown(markdown)
 
         except Exception as e:
             print(f"   ❌ Error: {e}")
             return []
 
+    def process_markdown(self, markdown: str) -> List[Dict[str, Any]]:
+        """
+        Turn a scraped job board page into jobs in the target regions, in ATLAS format.
+
+        Args:
+            markdown: Raw markdown content from scraping
+
+        Returns:
+            List of internship dictionaries
+        """
+        with stage("parse", self.SOURCE_NAME):
+            jobs = self.parse_jobs(markdown)
+        trace_allocations("parse", self.SOURCE_NAME, self.parse_jobs, markdown)
+        with stage("filter", self.SOURCE_NAME):
+            region_jobs = self.filter_regions(jobs)
+
+        print(f"   Found {len(jobs)} total, {len(region_jobs)} in {', '.join(sorted(self.regions))}")
+        with stage("format", self.SOURCE_NAME):
+            return [self.to_atlas_format(j) for j in region_jobs]
+
     def parse_jobs(self, markdown: str) -> List[Dict[str, Any]]:
         """
         Parse YC job board markdown into structured data.
@@ -154,13 +172,33 @@ class YCombinatorScraper(BaseScraper):
 
 # Test the scraper
 if __name__ == "__main__":
+    import argparse
     import asyncio
+    from datetime import datetime
+
+    import profiling
+
+    parser = argparse.ArgumentParser(description="Test the YC scraper")
+    parser.add_argument("--profile", nargs="?", const="", metavar="DIR",
+                        help="Profile each stage and write reports to DIR")
+    parser.add_argument("--markdown", metavar="FILE",
+                        help="Parse a saved page (e.g. ../yc_jobs_raw.md) instead of scraping")
+    args = parser.parse_args()
 
     async def test():
         scraper = YCombinatorScraper()
-        jobs = await scraper.scrape_internships()
-        print(f"\n✅ Found {len(jobs)} California internships from YC")
+        if args.markdown:
+            with open(args.markdown) as f:
+                jobs = scraper.process_markdown(f.read())
+        else:
+            jobs = await scraper.scrape_internships()
+        print(f"\n✅ Found {len(jobs)} internships from YC")
         for job in jobs[:5]:
             print(f"   - {job.get('company', 'Unknown')}: {job.get('title', 'Unknown')}")
 
-    asyncio.run(test())
+    if args.profile is not None:
+        profiling.enable(args.profile or f"profiles/yc_{datetime.now():%Y-%m-%d_%H%M%S}")
+    try:
+        asyncio.run(test())
+    finally:
+        profiling.disable()